@@ -0,0 +1,93 @@
+"""
+コロプレス地図描画のベンチマーク
+GeoJSON全体を毎回シリアライズする方式と、事前簡略化済みジオメトリに
+値列だけを結合する方式のペイロードサイズと更新時間を比較する
+
+実行方法:
+    python -m benchmarks.bench_choropleth [GeoJSONのパス]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.services.geo_service import PrefectureGeometry, build_choropleth_deck
+
+REPEAT = 20
+
+
+def _synthetic_geojson(path: Path, prefectures: int = 47, points: int = 20000) -> None:
+    """都道府県相当の詳細な合成GeoJSONを生成"""
+    rng = np.random.default_rng(0)
+    features = []
+    for i in range(prefectures):
+        cx, cy = 128 + (i % 8) * 2.0, 26 + (i // 8) * 3.0
+        angles = np.linspace(0, 2 * np.pi, points)
+        radius = 0.8 + 0.05 * rng.standard_normal(points).cumsum() / np.sqrt(points)
+        ring = np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+        ring[-1] = ring[0]
+        features.append({
+            "type": "Feature",
+            "properties": {"nam_ja": f"県{i:02d}"},
+            "geometry": {"type": "Polygon", "coordinates": [ring.round(6).tolist()]},
+        })
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def _timeit(func) -> float:
+    """関数の平均実行時間（ミリ秒）を計測"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            source = Path(sys.argv[1])
+        else:
+            source = Path(tmp) / "prefectures.geojson"
+            _synthetic_geojson(source)
+
+        raw = json.loads(source.read_text(encoding="utf-8"))
+        names = [feature["properties"]["nam_ja"] for feature in raw["features"]]
+        rng = np.random.default_rng(1)
+
+        def naive_update():
+            for feature in raw["features"]:
+                feature["properties"]["value"] = float(rng.integers(500000, 9000000))
+            return json.dumps(raw)
+
+        naive_ms = _timeit(naive_update)
+        print(f"GeoJSON全体の再シリアライズ: {len(naive_update()) / 1024:9.1f} KiB {naive_ms:8.2f} ms/更新")
+
+        start = time.perf_counter()
+        geometry = PrefectureGeometry.from_geojson(str(source))
+        npz = Path(tmp) / "prefectures.npz"
+        geometry.save(str(npz))
+        print(f"事前簡略化（一度のみ）: {(time.perf_counter() - start) * 1000:.1f} ms, npz {npz.stat().st_size / 1024:.1f} KiB")
+
+        start = time.perf_counter()
+        geometry = PrefectureGeometry.load(str(npz))
+        print(f"npz読み込み（プロセスごとに一度）: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        for level in geometry.zoom_levels:
+            geometry.polygon_frame(level)
+
+            def update():
+                values = dict(zip(names, rng.integers(500000, 9000000, len(names)).astype(float)))
+                return build_choropleth_deck(geometry, values, zoom=level).to_json()
+
+            update_ms = _timeit(update)
+            print(
+                f"レベル{level}: {geometry.point_count(level):7d} 頂点 "
+                f"{len(update()) / 1024:9.1f} KiB {update_ms:8.2f} ms/更新"
+            )
+
+
+if __name__ == "__main__":
+    main()
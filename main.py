@@ -6,6 +6,7 @@ import json
 import matplotlib.pyplot as plt
 import plotly.express as px
 from dotenv import load_dotenv
+from src.services.geo_service import build_choropleth_deck, load_prefecture_geometry
 
 # Load environment variables
 load_dotenv()
@@ -211,6 +212,19 @@ if fetch_button and API_KEY:
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("地域比較を表示するには、複数の都道府県を選択してください。")
+
+            # Prefecture choropleth map
+            st.markdown("### 都道府県別人口マップ")
+            try:
+                geometry = load_prefecture_geometry()
+                if geometry is None:
+                    st.info("都道府県境界データが見つかりません。PREFECTURE_GEOMETRY_PATHにGeoJSONを配置してください。")
+                else:
+                    map_df = region_df[region_df["年齢層"] == selected_age[0]]
+                    pref_values = dict(zip(map_df["地域"], map_df["人口"]))
+                    st.pydeck_chart(build_choropleth_deck(geometry, pref_values))
+            except Exception as e:
+                st.warning(f"⚠️ 都道府県境界データを読み込めませんでした: {e}")
         
         with tab3:
             # Age distribution
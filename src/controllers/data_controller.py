@@ -10,6 +10,8 @@ class DataController:
     """
     データ処理と表示を制御するコントローラークラス
     """
+    CSV_CHUNK_ROWS = 100_000
+    
     def __init__(self, data_service: DataService):
         """
         コントローラーの初期化
@@ -30,9 +32,12 @@ class DataController:
         
         if uploaded_file is not None:
             try:
-                # データの読み込みと処理
-                df = pd.read_csv(uploaded_file)
-                self._service.process_data(df)
+                # 全チャンクを検証してから取り込み、途中で失敗した場合は何も追加しない
+                for chunk in pd.read_csv(uploaded_file, chunksize=self.CSV_CHUNK_ROWS):
+                    self._service.validate_data(chunk)
+                uploaded_file.seek(0)
+                for chunk in pd.read_csv(uploaded_file, chunksize=self.CSV_CHUNK_ROWS):
+                    self._service.process_data(chunk)
                 st.success("データを正常に読み込みました")
                 
                 # 分析結果の表示
@@ -2,9 +2,22 @@
 データモデルモジュール
 アプリケーションで使用するデータモデルを定義
 """
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, tzinfo
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 1件あたりのメモリ使用量を推定する際に計測するデータポイント数
+POINT_SAMPLE_SIZE = 32
+DEFAULT_CHUNK_SIZE = 100_000
 
 @dataclass
 class DataPoint:
@@ -22,12 +35,134 @@ class DataPoint:
     category: str
     metadata: Optional[dict] = None
 
+def estimate_point_bytes(data_points: List[DataPoint]) -> int:
+    """
+    データポイント1件あたりのメモリ使用量を推定
+
+    先頭の一部を sys.getsizeof で走査し、インスタンス・属性辞書・各属性値・
+    リストの参照分を合計した平均を返す。カテゴリ文字列は共有されていても
+    1件ごとに数えるため、実際より大きめの値となる。
+
+    Args:
+        data_points (List[DataPoint]): 推定対象のデータポイント
+
+    Returns:
+        int: 1件あたりの推定バイト数
+    """
+    sample = data_points[:POINT_SAMPLE_SIZE]
+    if not sample:
+        return 0
+    total = 0
+    for dp in sample:
+        total += sys.getsizeof(dp) + sys.getsizeof(dp.__dict__) + 8
+        total += sys.getsizeof(dp.timestamp) + sys.getsizeof(dp.value) + sys.getsizeof(dp.category)
+        if dp.metadata is not None:
+            total += sys.getsizeof(dp.metadata)
+    return -(-total // len(sample))
+
+@dataclass
+class _Segment:
+    """
+    ディスクに退避した列指向チャンク
+    
+    Attributes:
+        prefix (str): 列ファイルのパス接頭辞
+        count (int): データポイント数
+        category_counts (Dict[int, int]): カテゴリコードごとの件数
+        tz (Optional[tzinfo]): タイムスタンプのタイムゾーン（UTCのナノ秒で保存）
+        object_columns (List[str]): 列ファイルに変換できずpickleで保存した列
+    """
+    prefix: str
+    count: int
+    category_counts: Dict[int, int] = field(default_factory=dict)
+    tz: Optional[tzinfo] = None
+    object_columns: List[str] = field(default_factory=list)
+
 class DataSet:
     """
     データセットを管理するクラス
+    
+    メモリ上限を指定すると、上限を超えた時点で古いデータを列指向の
+    チャンクとしてディスクに退避し、読み込み時はメモリマップで走査する。
+    統計情報とカテゴリ索引は常にメモリ上に保持する。
+    メモリ使用量はデータポイントの推定サイズと add_memory_reporter で
+    登録された常駐データ（集計行列など）の合計で判定する。
     """
-    def __init__(self):
+    def __init__(
+        self,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        データセットの初期化
+        
+        Args:
+            memory_budget (Optional[int]): メモリ上に保持するデータの上限（バイト、Noneで無制限）
+            spill_dir (Optional[str]): 退避先の親ディレクトリ（データセットごとに
+                サブディレクトリを作成、省略時はシステムの一時ディレクトリ）
+            chunk_size (int): 一度に退避するデータポイント数
+        """
         self._data: List[DataPoint] = []
+        self._listeners: List[Callable[[List[DataPoint]], None]] = []
+        self._memory_reporters: List[Callable[[], int]] = []
+        self._resident_bytes = 0
+        self._closed = False
+        self._memory_budget = memory_budget
+        self._chunk_size = chunk_size
+        self._spill_dir = spill_dir
+        self._segment_dir: Optional[str] = None
+        self._finalizer: Optional[weakref.finalize] = None
+        self._segments: List[_Segment] = []
+        self._category_codes: Dict[str, int] = {}
+        self._category_counts: Dict[str, int] = {}
+        self._count = 0
+        self._total = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+    
+    def __len__(self) -> int:
+        self._check_open()
+        return self._count
+    
+    def _check_open(self) -> None:
+        """
+        close 済みでないことを確認
+        
+        Raises:
+            RuntimeError: close 済みの場合
+        """
+        if self._closed:
+            raise RuntimeError("データセットは既にクローズされています")
+    
+    @property
+    def spilled_count(self) -> int:
+        """ディスクに退避済みのデータポイント数"""
+        self._check_open()
+        return sum(segment.count for segment in self._segments)
+    
+    @property
+    def resident_bytes(self) -> int:
+        """メモリ上のデータポイントと登録済み常駐データの推定使用量（バイト）"""
+        return self._resident_bytes + sum(reporter() for reporter in self._memory_reporters)
+    
+    def add_memory_reporter(self, reporter: Callable[[], int]) -> None:
+        """
+        メモリ上限の判定に含める常駐データの使用量を返す関数を登録
+        
+        Args:
+            reporter (Callable[[], int]): 使用量（バイト）を返す関数
+        """
+        self._memory_reporters.append(reporter)
+    
+    def add_listener(self, listener: Callable[[List[DataPoint]], None]) -> None:
+        """
+        データ追加時に呼び出されるリスナーを登録
+        
+        Args:
+            listener (Callable[[List[DataPoint]], None]): 追加されたデータポイントを受け取る関数
+        """
+        self._listeners.append(listener)
     
     def add_data_point(self, data_point: DataPoint) -> None:
         """
@@ -36,16 +171,205 @@ class DataSet:
         Args:
             data_point (DataPoint): 追加するデータポイント
         """
-        self._data.append(data_point)
+        self.add_data_points([data_point])
+    
+    def add_data_points(self, data_points: List[DataPoint]) -> None:
+        """
+        複数のデータポイントを一括で追加
+        
+        Args:
+            data_points (List[DataPoint]): 追加するデータポイントのリスト
+        """
+        self._check_open()
+        data_points = list(data_points)
+        if not data_points:
+            return
+        
+        self._data.extend(data_points)
+        self._resident_bytes += estimate_point_bytes(data_points) * len(data_points)
+        self._update_statistics(data_points)
+        for listener in self._listeners:
+            listener(data_points)
+        
+        if self._memory_budget is not None:
+            while self._data and self.resident_bytes > self._memory_budget:
+                self._spill(min(self._chunk_size, len(self._data)))
+    
+    def _update_statistics(self, data_points: List[DataPoint]) -> None:
+        """
+        常駐する統計情報とカテゴリ索引を更新
+        
+        Args:
+            data_points (List[DataPoint]): 追加されたデータポイントのリスト
+        """
+        values = [dp.value for dp in data_points]
+        self._count += len(values)
+        self._total += sum(values)
+        self._min = min(values) if self._min is None else min(self._min, min(values))
+        self._max = max(values) if self._max is None else max(self._max, max(values))
+        for dp in data_points:
+            if dp.category not in self._category_codes:
+                self._category_codes[dp.category] = len(self._category_codes)
+                self._category_counts[dp.category] = 0
+            self._category_counts[dp.category] += 1
+    
+    def _spill(self, count: int) -> None:
+        """
+        古いデータポイントを列指向チャンクとしてディスクに退避
+        
+        Args:
+            count (int): 退避するデータポイント数
+        """
+        if self._segment_dir is None:
+            # 退避先を共有するプロセスや他のデータセットと衝突しないよう専用ディレクトリを作成
+            if self._spill_dir is not None:
+                os.makedirs(self._spill_dir, exist_ok=True)
+            self._segment_dir = tempfile.mkdtemp(prefix="dataset-", dir=self._spill_dir)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._segment_dir, True)
+        
+        chunk = self._data[:count]
+        prefix = os.path.join(self._segment_dir, f"segment-{len(self._segments):06d}")
+        codes = np.array([self._category_codes[dp.category] for dp in chunk], dtype=np.int32)
+        np.save(f"{prefix}-category.npy", codes)
+        objects: Dict[str, list] = {}
+        
+        # タイムゾーンが揃っている場合のみUTCのナノ秒列として保存
+        timestamps = [dp.timestamp for dp in chunk]
+        zones = {getattr(ts, "tzinfo", None) for ts in timestamps}
+        tz = next(iter(zones)) if len(zones) == 1 else None
+        if len(zones) == 1:
+            np.save(f"{prefix}-timestamp.npy", pd.DatetimeIndex(timestamps).as_unit("ns").asi8)
+        else:
+            objects["timestamp"] = timestamps
+        
+        # 値の型が揃っていて数値列に変換できる場合のみ列ファイルとして保存
+        values = [dp.value for dp in chunk]
+        array = np.asarray(values)
+        if len({type(v) for v in values}) == 1 and array.dtype.kind in "biuf":
+            np.save(f"{prefix}-value.npy", array)
+        else:
+            objects["value"] = values
+        
+        metadata = {i: dp.metadata for i, dp in enumerate(chunk) if dp.metadata is not None}
+        if metadata:
+            objects["metadata"] = metadata
+        if objects:
+            with open(f"{prefix}-objects.pkl", "wb") as f:
+                pickle.dump(objects, f)
+        
+        unique, counts = np.unique(codes, return_counts=True)
+        self._segments.append(_Segment(
+            prefix=prefix,
+            count=count,
+            category_counts=dict(zip(unique.tolist(), counts.tolist())),
+            tz=tz,
+            object_columns=list(objects)
+        ))
+        self._resident_bytes -= self._resident_bytes * count // len(self._data)
+        del self._data[:count]
+    
+    def close(self) -> None:
+        """
+        データセットをクローズし、退避済みのデータファイルを削除
+        
+        クローズ後にデータセットを使用すると RuntimeError を送出する
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        self._closed = True
+        self._data.clear()
+        self._segments.clear()
+        self._resident_bytes = 0
+        self._segment_dir = None
+        self._finalizer = None
+    
+    def _read_segment(self, segment: _Segment, code: Optional[int] = None) -> List[DataPoint]:
+        """
+        退避済みチャンクをメモリマップで読み込み
+        
+        Args:
+            segment (_Segment): 読み込むチャンク
+            code (Optional[int]): 指定した場合はこのカテゴリコードの行のみ読み込む
+        
+        Returns:
+            List[DataPoint]: データポイントのリスト
+        """
+        codes = np.load(f"{segment.prefix}-category.npy", mmap_mode="r")
+        rows = np.arange(segment.count) if code is None else np.flatnonzero(codes == code)
+        objects: Dict[str, list] = {}
+        if segment.object_columns:
+            with open(f"{segment.prefix}-objects.pkl", "rb") as f:
+                objects = pickle.load(f)
+        
+        if "timestamp" in objects:
+            timestamps = [objects["timestamp"][row] for row in rows]
+        else:
+            stamps = np.load(f"{segment.prefix}-timestamp.npy", mmap_mode="r")[rows]
+            timestamps = pd.DatetimeIndex(stamps.astype("datetime64[ns]"))
+            if segment.tz is not None:
+                timestamps = timestamps.tz_localize("UTC").tz_convert(segment.tz)
+        
+        if "value" in objects:
+            values = [objects["value"][row] for row in rows]
+        else:
+            values = np.load(f"{segment.prefix}-value.npy", mmap_mode="r")[rows].tolist()
+        
+        metadata: Dict[int, dict] = objects.get("metadata", {})
+        names = list(self._category_codes)
+        return [
+            DataPoint(
+                timestamp=timestamp,
+                value=value,
+                category=names[category],
+                metadata=metadata.get(row)
+            )
+            for row, timestamp, value, category in zip(
+                rows.tolist(),
+                timestamps,
+                values,
+                codes[rows].tolist()
+            )
+        ]
+    
+    def iter_chunks(self) -> Iterator[List[DataPoint]]:
+        """
+        退避済みチャンクとメモリ上のデータを追加順に走査
+        
+        Yields:
+            List[DataPoint]: チャンクごとのデータポイントのリスト
+        """
+        self._check_open()
+        for segment in self._segments:
+            yield self._read_segment(segment)
+        if self._data:
+            yield self._data.copy()
+    
+    def statistics(self) -> Dict[str, object]:
+        """
+        常駐している統計情報を取得
+        
+        Returns:
+            Dict[str, object]: 件数・合計・最小値・最大値・カテゴリ別件数を含む辞書
+        """
+        self._check_open()
+        return {
+            "count": self._count,
+            "sum": self._total,
+            "min": self._min,
+            "max": self._max,
+            "category_counts": dict(self._category_counts),
+        }
     
     def get_data(self) -> List[DataPoint]:
         """
         全データポイントを取得
         
+        退避済みのデータも読み込むため、大規模データでは iter_chunks を使用すること
+        
         Returns:
             List[DataPoint]: データポイントのリスト
         """
-        return self._data.copy()
+        return [dp for chunk in self.iter_chunks() for dp in chunk]
     
     def filter_by_category(self, category: str) -> List[DataPoint]:
         """
@@ -53,8 +377,18 @@ class DataSet:
         
         Args:
             category (str): フィルタリングするカテゴリ
-            
+        
         Returns:
             List[DataPoint]: フィルタリングされたデータポイントのリスト
         """
-        return [d for d in self._data if d.category == category]
+        self._check_open()
+        code = self._category_codes.get(category)
+        if code is None:
+            return []
+        
+        result: List[DataPoint] = []
+        for segment in self._segments:
+            if segment.category_counts.get(code):
+                result.extend(self._read_segment(segment, code))
+        result.extend(d for d in self._data if d.category == category)
+        return result
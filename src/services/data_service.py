@@ -2,16 +2,43 @@
 データサービスモジュール
 データの処理と分析を行うビジネスロジックを提供
 """
+import os
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from src.models.data_model import DataSet, DataPoint
+from src.services.windowed_analytics import WindowedAnalytics
 
 class DataService:
     """
     データ処理と分析のためのサービスクラス
     """
-    def __init__(self):
-        self._dataset = DataSet()
+    INGEST_CHUNK_ROWS = 50_000
+    
+    def __init__(
+        self,
+        freq: str = "Y",
+        window: int = 3,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        サービスの初期化
+        
+        Args:
+            freq (str): 時系列分析の期間の頻度（"Y": 年次, "M": 月次）
+            window (int): 移動平均のウィンドウ（期間数）
+            memory_budget (Optional[int]): データセットのメモリ上限（バイト、時系列分析の
+                集計行列を含む。省略時は環境変数 DATASET_MEMORY_BUDGET_MB を使用）
+            spill_dir (Optional[str]): 上限超過時の退避先ディレクトリ
+                （省略時は環境変数 DATASET_SPILL_DIR、未設定なら一時ディレクトリ）
+        """
+        if memory_budget is None and os.getenv("DATASET_MEMORY_BUDGET_MB"):
+            memory_budget = int(float(os.environ["DATASET_MEMORY_BUDGET_MB"]) * 1024 * 1024)
+        self._dataset = DataSet(
+            memory_budget=memory_budget,
+            spill_dir=spill_dir or os.getenv("DATASET_SPILL_DIR") or None
+        )
+        self._analytics = WindowedAnalytics(self._dataset, freq=freq, window=window)
     
     def process_data(self, raw_data: pd.DataFrame) -> None:
         """
@@ -23,14 +50,36 @@ class DataService:
         # データの前処理と検証
         processed_data = self._preprocess_data(raw_data)
         
-        # データセットに追加
-        for _, row in processed_data.iterrows():
-            data_point = DataPoint(
-                timestamp=row['timestamp'],
-                value=row['value'],
-                category=row['category']
-            )
-            self._dataset.add_data_point(data_point)
+        # データセットにチャンク単位で一括追加（メモリ上限を超えた分は退避される）
+        for start in range(0, len(processed_data), self.INGEST_CHUNK_ROWS):
+            chunk = processed_data.iloc[start:start + self.INGEST_CHUNK_ROWS]
+            data_points = [
+                DataPoint(timestamp=timestamp, value=value, category=category)
+                for timestamp, value, category in zip(
+                    chunk['timestamp'],
+                    chunk['value'],
+                    chunk['category']
+                )
+            ]
+            self._dataset.add_data_points(data_points)
+    
+    def validate_data(self, raw_data: pd.DataFrame) -> None:
+        """
+        生データをデータセットに追加せずに検証
+        
+        Args:
+            raw_data (pd.DataFrame): 検証する生データ
+            
+        Raises:
+            Exception: 必須列の欠落や型変換に失敗した場合
+        """
+        self._preprocess_data(raw_data)
+    
+    def close(self) -> None:
+        """
+        データセットが退避したデータファイルを削除
+        """
+        self._dataset.close()
     
     def _preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
@@ -59,23 +108,38 @@ class DataService:
         Returns:
             Dict[str, Any]: 分析結果を含む辞書
         """
-        data_points = self._dataset.get_data()
+        # 常駐している統計情報を使用（退避済みデータは読み込まない）
+        stats = self._dataset.statistics()
         
-        if not data_points:
+        if not stats["count"]:
             return {"error": "データが存在しません"}
         
-        # 基本的な統計情報を計算
-        values = [dp.value for dp in data_points]
-        categories = set(dp.category for dp in data_points)
-        
         results = {
-            "total_points": len(data_points),
-            "categories": list(categories),
+            "total_points": stats["count"],
+            "categories": list(stats["category_counts"]),
             "statistics": {
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values)
+                "mean": stats["sum"] / stats["count"],
+                "min": stats["min"],
+                "max": stats["max"]
             }
         }
         
         return results
+    
+    def get_time_series_analysis(self) -> Dict[str, Any]:
+        """
+        カテゴリ別の時系列分析結果を取得
+        
+        Returns:
+            Dict[str, Any]: 移動平均・前年同期比・年平均成長率・最新値を含む辞書
+        """
+        if not self._analytics.categories:
+            return {"error": "データが存在しません"}
+        
+        return {
+            "window": self._analytics.window,
+            "rolling_mean": self._analytics.rolling_mean(),
+            "yoy_change": self._analytics.yoy_change(),
+            "growth_rates": self._analytics.growth_rates(),
+            "latest": self._analytics.latest()
+        }
@@ -0,0 +1,394 @@
+"""
+地理データサービスモジュール
+都道府県境界ジオメトリの事前簡略化・キャッシュとコロプレス地図の生成を提供
+"""
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+
+# ズームレベルごとのDouglas-Peucker許容誤差（度単位）
+# pydeckのズームはブラウザ側で行われサーバーに通知されないため、
+# アプリの初期表示（ズーム4.5）で使うレベル4のみを事前計算する
+ZOOM_TOLERANCES: Dict[int, float] = {
+    4: 0.02,
+}
+
+DEFAULT_GEOMETRY_PATH = "data/prefectures.geojson"
+NO_DATA_COLOR = [200, 200, 200, 80]
+_LOW_COLOR = np.array([222, 235, 247], dtype=np.float64)
+_HIGH_COLOR = np.array([8, 48, 107], dtype=np.float64)
+_geometry_cache: Dict[str, "PrefectureGeometry"] = {}
+_geometry_lock = threading.Lock()
+
+
+def _simplify_ring(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker法でリングを簡略化
+
+    Args:
+        ring (np.ndarray): (N, 2) の座標配列（始点と終点は同一）
+        tolerance (float): 許容誤差
+
+    Returns:
+        np.ndarray: 簡略化された座標配列
+    """
+    if len(ring) <= 4 or tolerance <= 0:
+        return ring
+
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = ring[start + 1:end]
+        origin = ring[start]
+        direction = ring[end] - origin
+        norm = np.hypot(direction[0], direction[1])
+        offset = segment - origin
+        if norm == 0:
+            distances = np.hypot(offset[:, 0], offset[:, 1])
+        else:
+            distances = np.abs(
+                direction[0] * offset[:, 1] - direction[1] * offset[:, 0]
+            ) / norm
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return ring[keep]
+
+
+def _exterior_rings(geometry: dict) -> List[np.ndarray]:
+    """
+    GeoJSONジオメトリから外周リングを抽出
+
+    Args:
+        geometry (dict): Polygon または MultiPolygon のGeoJSONジオメトリ
+
+    Returns:
+        List[np.ndarray]: 外周リングの座標配列のリスト
+    """
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        raise ValueError(f"未対応のジオメトリ型です: {geometry['type']}")
+    return [np.asarray(polygon[0], dtype=np.float64) for polygon in polygons]
+
+
+class PrefectureGeometry:
+    """
+    ズームレベル別に事前簡略化した都道府県ジオメトリを保持するクラス
+
+    座標は各レベルごとに連続した float32 配列とリングのオフセット配列で
+    列指向に保持し、npz形式で保存・読み込みする。
+    """
+    def __init__(self, names: List[str], levels: Dict[int, Dict[str, np.ndarray]]):
+        """
+        ジオメトリの初期化
+
+        Args:
+            names (List[str]): 都道府県名のリスト
+            levels (Dict[int, Dict[str, np.ndarray]]): ズームレベルごとの
+                coords / ring_offsets / ring_owner 配列
+        """
+        self._names = list(names)
+        self._levels = levels
+        self._frames: Dict[int, pd.DataFrame] = {}
+
+    @property
+    def names(self) -> List[str]:
+        """都道府県名のリスト"""
+        return list(self._names)
+
+    @property
+    def zoom_levels(self) -> List[int]:
+        """事前簡略化済みのズームレベル（昇順）"""
+        return sorted(self._levels)
+
+    @classmethod
+    def from_geojson(
+        cls,
+        path: str,
+        name_property: str = "nam_ja",
+        tolerances: Optional[Dict[int, float]] = None
+    ) -> "PrefectureGeometry":
+        """
+        GeoJSONファイルからジオメトリを構築し、各ズームレベルで簡略化
+
+        Args:
+            path (str): GeoJSONファイルのパス
+            name_property (str): 都道府県名を保持するプロパティ名
+            tolerances (Optional[Dict[int, float]]): ズームレベルごとの許容誤差
+
+        Returns:
+            PrefectureGeometry: 構築したジオメトリ
+        """
+        tolerances = tolerances or ZOOM_TOLERANCES
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+
+        names = [feature["properties"][name_property] for feature in features]
+        rings = [_exterior_rings(feature["geometry"]) for feature in features]
+
+        levels = {}
+        for zoom, tolerance in tolerances.items():
+            coords, offsets, owners = [], [0], []
+            for owner, feature_rings in enumerate(rings):
+                simplified = [_simplify_ring(ring, tolerance) for ring in feature_rings]
+                kept = [ring for ring in simplified if len(ring) >= 4]
+                if not kept:
+                    # 全リングが潰れた場合は最大のリングを元の解像度で残す
+                    kept = [max(feature_rings, key=len)]
+                for ring in kept:
+                    coords.append(ring)
+                    offsets.append(offsets[-1] + len(ring))
+                    owners.append(owner)
+            levels[zoom] = {
+                "coords": np.concatenate(coords).astype(np.float32),
+                "ring_offsets": np.asarray(offsets, dtype=np.int32),
+                "ring_owner": np.asarray(owners, dtype=np.int32),
+            }
+
+        return cls(names, levels)
+
+    @classmethod
+    def load(cls, path: str) -> "PrefectureGeometry":
+        """
+        npzファイルからジオメトリを読み込み
+
+        Args:
+            path (str): npzファイルのパス
+
+        Returns:
+            PrefectureGeometry: 読み込んだジオメトリ
+        """
+        with np.load(path) as archive:
+            names = archive["names"].tolist()
+            levels = {
+                int(zoom): {
+                    key: archive[f"level{zoom}_{key}"]
+                    for key in ("coords", "ring_offsets", "ring_owner")
+                }
+                for zoom in archive["zoom_levels"]
+            }
+        return cls(names, levels)
+
+    def save(self, path: str) -> None:
+        """
+        ジオメトリをnpzファイルとして保存
+
+        同じディレクトリの一時ファイルに書き込んでから置き換えるため、
+        読み込み側が書き込み途中のファイルを参照することはない
+
+        Args:
+            path (str): 保存先のパス
+        """
+        arrays = {
+            "names": np.asarray(self._names),
+            "zoom_levels": np.asarray(self.zoom_levels, dtype=np.int32),
+        }
+        for zoom, level in self._levels.items():
+            for key, array in level.items():
+                arrays[f"level{zoom}_{key}"] = array
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".prefectures-", suffix=".npz", dir=os.path.dirname(os.path.abspath(path))
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def level_for_zoom(self, zoom: float) -> int:
+        """
+        表示ズームに対して使用する簡略化レベルを選択
+
+        Args:
+            zoom (float): 地図の表示ズーム
+
+        Returns:
+            int: ズーム以下で最も詳細な簡略化レベル
+        """
+        candidates = [level for level in self.zoom_levels if level <= zoom]
+        return candidates[-1] if candidates else self.zoom_levels[0]
+
+    def point_count(self, level: int) -> int:
+        """
+        指定レベルの頂点数を取得
+
+        Args:
+            level (int): 簡略化レベル
+
+        Returns:
+            int: 頂点数
+        """
+        return len(self._levels[level]["coords"])
+
+    def polygon_frame(self, level: int) -> pd.DataFrame:
+        """
+        指定レベルのポリゴンDataFrameを取得（レベルごとに一度だけ構築）
+
+        Args:
+            level (int): 簡略化レベル
+
+        Returns:
+            pd.DataFrame: name / polygon 列を持つDataFrame
+        """
+        if level not in self._frames:
+            arrays = self._levels[level]
+            coords = np.round(arrays["coords"].astype(np.float64), 5)
+            offsets = arrays["ring_offsets"]
+            polygons = [
+                coords[start:end].tolist()
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            self._frames[level] = pd.DataFrame({
+                "name": np.asarray(self._names, dtype=object)[arrays["ring_owner"]],
+                "polygon": polygons,
+            })
+        return self._frames[level]
+
+    def bind_values(self, values: Dict[str, float], level: int) -> pd.DataFrame:
+        """
+        キャッシュ済みポリゴンに値と塗り色の列だけを結合
+
+        Args:
+            values (Dict[str, float]): 都道府県名をキーとする値
+            level (int): 簡略化レベル
+
+        Returns:
+            pd.DataFrame: name / polygon / value / fill_color 列を持つDataFrame
+        """
+        frame = self.polygon_frame(level).copy(deep=False)
+        bound = frame["name"].map(values).astype(np.float64).to_numpy()
+        frame["value"] = np.where(np.isnan(bound), None, bound)
+        frame["fill_color"] = _color_scale(bound)
+        return frame
+
+
+def _color_scale(values: np.ndarray) -> List[List[int]]:
+    """
+    値を線形カラースケールでRGBA色に変換
+
+    Args:
+        values (np.ndarray): 値の配列（欠損はNaN）
+
+    Returns:
+        List[List[int]]: RGBA色のリスト
+    """
+    missing = np.isnan(values)
+    colors = np.tile(np.asarray(NO_DATA_COLOR, dtype=np.int64), (len(values), 1))
+    if missing.all():
+        return colors.tolist()
+
+    low = np.nanmin(values)
+    high = np.nanmax(values)
+    span = high - low if high > low else 1.0
+    ratio = ((values[~missing] - low) / span)[:, np.newaxis]
+    rgb = _LOW_COLOR + (_HIGH_COLOR - _LOW_COLOR) * ratio
+    colors[~missing, :3] = np.round(rgb).astype(np.int64)
+    colors[~missing, 3] = 200
+    return colors.tolist()
+
+
+def build_choropleth_deck(
+    geometry: PrefectureGeometry,
+    values: Dict[str, float],
+    zoom: float = 4.5
+) -> pdk.Deck:
+    """
+    都道府県コロプレス地図のpydeck Deckを生成
+
+    Args:
+        geometry (PrefectureGeometry): 事前簡略化済みジオメトリ
+        values (Dict[str, float]): 都道府県名をキーとする値
+        zoom (float): 初期表示ズーム
+
+    Returns:
+        pdk.Deck: 描画用Deck
+    """
+    frame = geometry.bind_values(values, geometry.level_for_zoom(zoom))
+    layer = pdk.Layer(
+        "PolygonLayer",
+        data=frame,
+        get_polygon="polygon",
+        get_fill_color="fill_color",
+        get_line_color=[255, 255, 255],
+        line_width_min_pixels=1,
+        stroked=True,
+        pickable=True,
+    )
+    view_state = pdk.ViewState(latitude=36.5, longitude=137.5, zoom=zoom)
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=view_state,
+        map_style=None,
+        tooltip={"text": "{name}: {value}"},
+    )
+
+
+def load_prefecture_geometry(path: Optional[str] = None) -> Optional[PrefectureGeometry]:
+    """
+    都道府県ジオメトリをプロセスごとに一度だけ読み込み
+
+    GeoJSONが指定された場合は簡略化後に同名の.npzへ保存し、
+    以降のプロセスではnpzを直接読み込む。ファイルが存在しない結果は
+    キャッシュしないため、起動後に配置されたファイルも次回の呼び出しで読み込まれる。
+    npzが破損している場合はGeoJSONから再構築する。
+
+    Args:
+        path (Optional[str]): GeoJSONまたはnpzのパス
+            （省略時は環境変数 PREFECTURE_GEOMETRY_PATH を使用）
+
+    Returns:
+        Optional[PrefectureGeometry]: ジオメトリ（ファイルが存在しない場合はNone）
+    """
+    source = Path(path or os.getenv("PREFECTURE_GEOMETRY_PATH", DEFAULT_GEOMETRY_PATH))
+    key = str(source)
+    if key in _geometry_cache:
+        return _geometry_cache[key]
+
+    # Streamlitはセッションごとに別スレッドで実行されるため、構築と保存を直列化する
+    with _geometry_lock:
+        if key in _geometry_cache:
+            return _geometry_cache[key]
+
+        cache = source.with_suffix(".npz")
+        rebuildable = source.exists() and source != cache
+        geometry = None
+        if cache.exists() and (
+            not rebuildable or cache.stat().st_mtime >= source.stat().st_mtime
+        ):
+            try:
+                geometry = PrefectureGeometry.load(str(cache))
+            except Exception:
+                if not rebuildable:
+                    raise
+        if geometry is None:
+            if not rebuildable:
+                return None
+            geometry = PrefectureGeometry.from_geojson(str(source))
+            try:
+                geometry.save(str(cache))
+            except OSError:
+                pass
+
+        _geometry_cache[key] = geometry
+        return geometry
@@ -0,0 +1,355 @@
+"""
+時系列ウィンドウ分析モジュール
+カテゴリ別の時系列バッファを保持し、移動平均・前年比・成長率を増分更新する
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.models.data_model import DataPoint, DataSet
+
+# 期間の頻度ごとの1年あたり期間数
+PERIODS_PER_YEAR: Dict[str, int] = {
+    "Y": 1,
+    "M": 12,
+}
+
+_EMPTY_STAMP = np.iinfo(np.int64).min
+
+
+class WindowedAnalytics:
+    """
+    全カテゴリを一括で扱う時系列ウィンドウ分析クラス
+
+    値は「カテゴリ × 期間」の行列に保持し、同一期間内では最新の
+    タイムスタンプの値を採用する。期間方向の累積和と観測数を増分で
+    維持するため、移動平均は全データを再計算せずに求められる。
+
+    ウィンドウは観測件数ではなく暦上の期間数で数え、欠測期間は平均から
+    除外される。このため欠測を含む系列では groupby().rolling(n) とは
+    結果が異なる（例: 5年ごとの国勢調査を年次で扱うと window=3 の平均は
+    常に1件の観測値となり、前年同期比は算出されない）。
+    タイムゾーン付きのタイムスタンプは現地時刻のまま期間に割り当て、
+    NaN・無限大の値は取り込まない。
+    """
+    def __init__(self, dataset: Optional[DataSet] = None, freq: str = "Y", window: int = 3):
+        """
+        分析の初期化
+
+        Args:
+            dataset (Optional[DataSet]): 監視するデータセット（既存データも取り込み、
+                集計行列の使用量をデータセットのメモリ上限に含める）
+            freq (str): 期間の頻度（"Y": 年次, "M": 月次）
+            window (int): 移動平均のデフォルトウィンドウ（期間数）
+        """
+        if freq not in PERIODS_PER_YEAR:
+            raise ValueError(f"未対応の頻度です: {freq}")
+        if window < 1:
+            raise ValueError("ウィンドウは1以上を指定してください")
+
+        self._freq = freq
+        self._window = window
+        self._categories: Dict[str, int] = {}
+        self._origin: Optional[int] = None
+        self._width = 0
+        self._values = np.empty((0, 0), dtype=np.float64)
+        self._stamps = np.empty((0, 0), dtype=np.int64)
+        self._cum_sum = np.empty((0, 0), dtype=np.float64)
+        self._cum_count = np.empty((0, 0), dtype=np.int64)
+
+        if dataset is not None:
+            for chunk in dataset.iter_chunks():
+                self.ingest(chunk)
+            dataset.add_listener(self.ingest)
+            dataset.add_memory_reporter(lambda: self.nbytes)
+
+    @property
+    def categories(self) -> List[str]:
+        """登録済みカテゴリのリスト"""
+        return list(self._categories)
+
+    @property
+    def nbytes(self) -> int:
+        """確保済みの集計行列の合計サイズ（バイト）"""
+        return (
+            self._values.nbytes + self._stamps.nbytes
+            + self._cum_sum.nbytes + self._cum_count.nbytes
+        )
+
+    @property
+    def window(self) -> int:
+        """移動平均のデフォルトウィンドウ"""
+        return self._window
+
+    def ingest(self, data_points: List[DataPoint]) -> None:
+        """
+        データポイントを取り込み、集計を増分更新
+
+        Args:
+            data_points (List[DataPoint]): 取り込むデータポイントのリスト
+        """
+        # 非有限値は累積和を壊すため取り込まない
+        data_points = [dp for dp in data_points if np.isfinite(dp.value)]
+        if not data_points:
+            return
+
+        for dp in data_points:
+            if dp.category not in self._categories:
+                self._categories[dp.category] = len(self._categories)
+
+        rows = np.fromiter(
+            (self._categories[dp.category] for dp in data_points),
+            dtype=np.int64, count=len(data_points)
+        )
+        # タイムゾーン付きの場合は現地時刻で期間に割り当てる
+        stamps = np.array(
+            [pd.Timestamp(dp.timestamp).tz_localize(None).to_datetime64() for dp in data_points],
+            dtype="datetime64[ns]"
+        )
+        periods = stamps.astype(f"datetime64[{self._freq}]").astype(np.int64)
+        stamps = stamps.astype(np.int64)
+        values = np.array([dp.value for dp in data_points], dtype=np.float64)
+
+        # 同一セル内では最新タイムスタンプの値のみ残す
+        order = np.lexsort((stamps, periods, rows))
+        rows, periods, stamps, values = rows[order], periods[order], stamps[order], values[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = (rows[1:] != rows[:-1]) | (periods[1:] != periods[:-1])
+        rows, periods, stamps, values = rows[last], periods[last], stamps[last], values[last]
+
+        self._ensure_capacity(int(periods.min()), int(periods.max()))
+        cols = periods - self._origin
+
+        current_stamps = self._stamps[rows, cols]
+        newer = stamps >= current_stamps
+        if not newer.any():
+            return
+        rows, cols, stamps, values = rows[newer], cols[newer], stamps[newer], values[newer]
+
+        previous = self._values[rows, cols]
+        was_empty = np.isnan(previous)
+        self._values[rows, cols] = values
+        self._stamps[rows, cols] = stamps
+
+        # 変更のあった最小期間以降の累積和のみを更新
+        start = int(cols.min())
+        sum_delta = np.zeros((len(self._categories), self._width - start), dtype=np.float64)
+        count_delta = np.zeros_like(sum_delta, dtype=np.int64)
+        np.add.at(sum_delta, (rows, cols - start), values - np.where(was_empty, 0.0, previous))
+        np.add.at(count_delta, (rows, cols - start), was_empty.astype(np.int64))
+        n_rows = len(self._categories)
+        self._cum_sum[:n_rows, start:self._width] += np.cumsum(sum_delta, axis=1)
+        self._cum_count[:n_rows, start:self._width] += np.cumsum(count_delta, axis=1)
+
+    def _ensure_capacity(self, period_min: int, period_max: int) -> None:
+        """
+        カテゴリ数と期間範囲に合わせて行列を拡張
+
+        Args:
+            period_min (int): 取り込む期間の最小序数
+            period_max (int): 取り込む期間の最大序数
+        """
+        if self._origin is None:
+            self._origin = period_min
+
+        prepend = max(self._origin - period_min, 0)
+        width = max(self._width + prepend, period_max - self._origin + prepend + 1)
+        n_rows = len(self._categories)
+        rows_cap, cols_cap = self._values.shape
+
+        if prepend or n_rows > rows_cap or width > cols_cap:
+            new_rows = max(n_rows, rows_cap * 2) if n_rows > rows_cap else rows_cap
+            new_cols = max(width, cols_cap * 2) if prepend or width > cols_cap else cols_cap
+            self._values = self._grow(self._values, np.nan, new_rows, new_cols, prepend)
+            self._stamps = self._grow(self._stamps, _EMPTY_STAMP, new_rows, new_cols, prepend)
+            self._cum_sum = self._grow(self._cum_sum, 0.0, new_rows, new_cols, prepend)
+            self._cum_count = self._grow(self._cum_count, 0, new_rows, new_cols, prepend)
+            self._origin -= prepend
+
+        # 新しく使う期間には直前の累積値を引き継ぐ
+        used = self._width + prepend
+        if used and width > used:
+            self._cum_sum[:, used:width] = self._cum_sum[:, used - 1:used]
+            self._cum_count[:, used:width] = self._cum_count[:, used - 1:used]
+        self._width = width
+
+    def _grow(self, array: np.ndarray, fill, n_rows: int, n_cols: int, prepend: int) -> np.ndarray:
+        """
+        行列を指定サイズへ拡張し、既存の値をコピー
+
+        Args:
+            array (np.ndarray): 既存の行列
+            fill: 新しいセルの初期値
+            n_rows (int): 拡張後の行数
+            n_cols (int): 拡張後の列数
+            prepend (int): 先頭に追加する列数
+
+        Returns:
+            np.ndarray: 拡張後の行列
+        """
+        grown = np.full((n_rows, n_cols), fill, dtype=array.dtype)
+        rows, _ = array.shape
+        grown[:rows, prepend:prepend + self._width] = array[:, :self._width]
+        return grown
+
+    def _frame(self, matrix: np.ndarray) -> pd.DataFrame:
+        """
+        「カテゴリ × 期間」の行列を期間インデックスのDataFrameに変換
+
+        Args:
+            matrix (np.ndarray): 変換する行列
+
+        Returns:
+            pd.DataFrame: インデックスが期間、列がカテゴリのDataFrame
+        """
+        ordinals = np.arange(self._origin or 0, (self._origin or 0) + self._width)
+        index = pd.DatetimeIndex(ordinals.astype(f"datetime64[{self._freq}]")).to_period(self._freq)
+        return pd.DataFrame(matrix.T, index=index, columns=self.categories)
+
+    def values(self) -> pd.DataFrame:
+        """
+        期間ごとの値を取得
+
+        Returns:
+            pd.DataFrame: インデックスが期間、列がカテゴリの値
+        """
+        return self._frame(self._values[:len(self._categories), :self._width])
+
+    def _rolling_matrix(self, window: int) -> np.ndarray:
+        """
+        累積和の差分から移動平均行列を計算
+
+        直近 window 期間のうち観測のある期間のみを平均する
+
+        Args:
+            window (int): ウィンドウ（暦上の期間数、欠測期間も数える）
+
+        Returns:
+            np.ndarray: 「カテゴリ × 期間」の移動平均
+        """
+        n_rows = len(self._categories)
+        cum_sum = self._cum_sum[:n_rows, :self._width]
+        cum_count = self._cum_count[:n_rows, :self._width]
+        sums = cum_sum.copy()
+        counts = cum_count.copy()
+        if window < self._width:
+            sums[:, window:] -= cum_sum[:, :-window]
+            counts[:, window:] -= cum_count[:, :-window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def rolling_mean(self, window: Optional[int] = None) -> pd.DataFrame:
+        """
+        カテゴリ別の移動平均を取得
+
+        直近 window 期間のうち観測のある期間のみを平均し、欠測期間は
+        ウィンドウの期間数には含めるが平均からは除外する
+
+        Args:
+            window (Optional[int]): ウィンドウ（暦上の期間数、省略時はデフォルトウィンドウ）
+
+        Returns:
+            pd.DataFrame: インデックスが期間、列がカテゴリの移動平均
+
+        Raises:
+            ValueError: ウィンドウが1未満の場合
+        """
+        window = self._window if window is None else window
+        if window < 1:
+            raise ValueError("ウィンドウは1以上を指定してください")
+        return self._frame(self._rolling_matrix(window))
+
+    def _yoy_matrix(self) -> np.ndarray:
+        """
+        前年同期比の行列を計算
+
+        Returns:
+            np.ndarray: 「カテゴリ × 期間」の前年同期比（変化率）
+        """
+        lag = PERIODS_PER_YEAR[self._freq]
+        current = self._values[:len(self._categories), :self._width]
+        change = np.full_like(current, np.nan)
+        if lag < self._width:
+            previous = current[:, :-lag]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                change[:, lag:] = np.where(previous != 0, current[:, lag:] / previous - 1, np.nan)
+        return change
+
+    def yoy_change(self) -> pd.DataFrame:
+        """
+        カテゴリ別の前年同期比を取得
+
+        ちょうど1年前の期間に観測がない場合はNaNとなる
+
+        Returns:
+            pd.DataFrame: インデックスが期間、列がカテゴリの前年同期比（変化率）
+        """
+        return self._frame(self._yoy_matrix())
+
+    def growth_rates(self) -> Dict[str, float]:
+        """
+        カテゴリ別の年平均成長率（最初と最後の観測値から算出）を取得
+
+        Returns:
+            Dict[str, float]: カテゴリをキーとする年平均成長率
+        """
+        current = self._values[:len(self._categories), :self._width]
+        if current.size == 0:
+            return {}
+
+        observed = ~np.isnan(current)
+        first = np.argmax(observed, axis=1)
+        last = self._width - 1 - np.argmax(observed[:, ::-1], axis=1)
+        rows = np.arange(len(current))
+        start, end = current[rows, first], current[rows, last]
+        years = (last - first) / PERIODS_PER_YEAR[self._freq]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = np.where(
+                (years > 0) & (start > 0) & (end >= 0),
+                np.power(end / start, 1 / np.where(years > 0, years, 1)) - 1,
+                np.nan
+            )
+        return dict(zip(self.categories, rates.tolist()))
+
+    def latest(self) -> pd.DataFrame:
+        """
+        カテゴリ別の最新期間の集計を取得
+
+        移動平均と前年同期比は rolling_mean / yoy_change と同じく暦上の
+        期間で計算するため、欠測期間を含むカテゴリでは観測件数が少なくなる
+
+        Returns:
+            pd.DataFrame: カテゴリをインデックスとし、期間・値・移動平均・
+                前年同期比・年平均成長率の列を持つDataFrame
+        """
+        columns = ["period", "value", "rolling_mean", "yoy_change", "growth_rate"]
+        if not self._categories:
+            return pd.DataFrame(columns=columns)
+
+        current = self._values[:len(self._categories), :self._width]
+        observed = ~np.isnan(current)
+        last = self._width - 1 - np.argmax(observed[:, ::-1], axis=1)
+        rows = np.arange(len(current))
+        periods = self._frame(current).index[last]
+        value = current[rows, last]
+
+        # 最新期間の列だけを累積和の差分から求める
+        before = last - self._window
+        has_before = before >= 0
+        before = np.where(has_before, before, 0)
+        sums = self._cum_sum[rows, last] - np.where(has_before, self._cum_sum[rows, before], 0.0)
+        counts = self._cum_count[rows, last] - np.where(has_before, self._cum_count[rows, before], 0)
+
+        lag = last - PERIODS_PER_YEAR[self._freq]
+        previous = np.where(lag >= 0, current[rows, np.maximum(lag, 0)], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            yoy = np.where(previous != 0, value / previous - 1, np.nan)
+
+        return pd.DataFrame({
+            "period": periods,
+            "value": value,
+            "rolling_mean": sums / counts,
+            "yoy_change": yoy,
+            "growth_rate": list(self.growth_rates().values()),
+        }, index=pd.Index(self.categories, name="category"), columns=columns)
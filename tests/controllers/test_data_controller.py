@@ -1,6 +1,7 @@
 """
 データコントローラーのテストモジュール
 """
+import io
 import pytest
 import pandas as pd
 import streamlit as st
@@ -71,3 +72,41 @@ def test_show_data_filters(data_controller, data_service):
             "カテゴリ選択",
             options=["全て", "カテゴリA", "カテゴリB"]
         )
+
+@pytest.fixture
+def uploaded_csv():
+    """アップロードされたCSVファイルのモック"""
+    return io.BytesIO(
+        "timestamp,value,category\n"
+        "2024-01-01,10,A\n"
+        "2024-01-02,20,B\n"
+        "2024-01-03,30,A\n"
+        "2024-01-04,40,B\n"
+        "2024-01-05,50,A\n".encode("utf-8")
+    )
+
+def test_handle_file_upload_in_chunks(data_controller, data_service, uploaded_csv):
+    """ファイルアップロードのチャンク処理テスト"""
+    data_controller.CSV_CHUNK_ROWS = 2
+    data_service.get_analysis_results.return_value = {"error": "データが存在しません"}
+    
+    with patch("streamlit.file_uploader", return_value=uploaded_csv):
+        with patch("streamlit.success") as mock_success:
+            data_controller.handle_file_upload()
+            mock_success.assert_called_once()
+    
+    assert data_service.validate_data.call_count == 3
+    assert data_service.process_data.call_count == 3
+    assert sum(len(call.args[0]) for call in data_service.process_data.call_args_list) == 5
+
+def test_handle_file_upload_invalid_chunk(data_controller, data_service, uploaded_csv):
+    """後続チャンクが不正な場合に何も取り込まれないことのテスト"""
+    data_controller.CSV_CHUNK_ROWS = 2
+    data_service.validate_data.side_effect = [None, ValueError("不正な値"), None]
+    
+    with patch("streamlit.file_uploader", return_value=uploaded_csv):
+        with patch("streamlit.error") as mock_error:
+            data_controller.handle_file_upload()
+            mock_error.assert_called_once_with("エラーが発生しました: 不正な値")
+    
+    data_service.process_data.assert_not_called()
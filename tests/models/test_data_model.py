@@ -1,9 +1,13 @@
 """
 データモデルのテストモジュール
 """
-from datetime import datetime
+import gc
+import os
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+import pandas as pd
 import pytest
-from src.models.data_model import DataPoint, DataSet
+from src.models.data_model import DataPoint, DataSet, estimate_point_bytes
 
 def test_data_point_creation():
     """データポイントの作成テスト"""
@@ -51,3 +55,140 @@ def test_dataset_filter_by_category():
     cat1_data = dataset.filter_by_category("cat1")
     assert len(cat1_data) == 2
     assert all(dp.category == "cat1" for dp in cat1_data)
+
+def test_dataset_add_data_points_notifies_listeners():
+    """一括追加とリスナー通知のテスト"""
+    dataset = DataSet()
+    received = []
+    dataset.add_listener(received.append)
+    
+    points = [DataPoint(datetime.now(), 1.0, "cat1"), DataPoint(datetime.now(), 2.0, "cat2")]
+    dataset.add_data_points(points)
+    dataset.add_data_point(points[0])
+    
+    assert len(dataset.get_data()) == 3
+    assert received == [points, [points[0]]]
+
+def test_dataset_spills_to_disk_over_budget(tmp_path):
+    """メモリ上限超過時にディスクへ退避しても取得結果が変わらないことのテスト"""
+    points = [
+        DataPoint(datetime(2024, 1, i + 1), float(i), "cat1" if i % 2 else "cat2",
+                  metadata={"row": i} if i == 1 else None)
+        for i in range(7)
+    ]
+    budget = estimate_point_bytes(points) * 3
+    dataset = DataSet(memory_budget=budget, spill_dir=str(tmp_path), chunk_size=2)
+    dataset.add_data_points(points[:4])
+    for dp in points[4:]:
+        dataset.add_data_point(dp)
+    
+    assert dataset.spilled_count > 0
+    assert dataset.resident_bytes <= budget
+    assert len(dataset) == 7
+    assert any(tmp_path.iterdir())
+    assert dataset.get_data() == points
+    assert dataset.filter_by_category("cat1") == [dp for dp in points if dp.category == "cat1"]
+    assert dataset.filter_by_category("unknown") == []
+
+def test_dataset_spill_preserves_timezone_and_value_type(tmp_path):
+    """退避・復元でタイムゾーンと値の型が変わらないことのテスト"""
+    jst = timezone(timedelta(hours=9))
+    points = [
+        DataPoint(datetime(2024, 1, 1), 1.5, "cat1"),
+        DataPoint(datetime(2024, 1, 2), 2.5, "cat2"),
+        DataPoint(datetime(2024, 1, 3, tzinfo=jst), 3000, "cat1"),
+        DataPoint(datetime(2024, 1, 4, tzinfo=jst), 4000, "cat2"),
+        DataPoint(datetime(2024, 1, 5, tzinfo=jst), 5.5, "cat1"),
+    ]
+    dataset = DataSet(memory_budget=0, spill_dir=str(tmp_path), chunk_size=2)
+    dataset.add_data_points(points)
+    restored = dataset.get_data()
+    
+    assert dataset.spilled_count == 5
+    assert restored == points
+    for original, spilled in zip(points, restored):
+        assert spilled.timestamp.utcoffset() == original.timestamp.utcoffset()
+        assert spilled.timestamp.replace(tzinfo=None) == original.timestamp.replace(tzinfo=None)
+        assert type(spilled.value) is type(original.value)
+
+def test_estimate_point_bytes_covers_measured_usage():
+    """推定サイズが実測のメモリ使用量を下回らないことのテスト"""
+    timestamps = pd.date_range("2024-01-01", periods=2000, freq="h")
+    categories = ["東京都", "北海道"]
+    
+    tracemalloc.start()
+    points = [
+        DataPoint(timestamp=timestamp, value=float(i), category=categories[i % 2])
+        for i, timestamp in enumerate(timestamps)
+    ]
+    measured, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    assert estimate_point_bytes(points) * len(points) >= measured
+
+def test_memory_reporter_counts_against_budget(tmp_path):
+    """登録した常駐データの使用量がメモリ上限に含まれることのテスト"""
+    points = [DataPoint(datetime(2024, 1, 1), 1.0, "cat1")] * 4
+    dataset = DataSet(memory_budget=estimate_point_bytes(points) * 10, spill_dir=str(tmp_path))
+    dataset.add_data_points(points)
+    assert dataset.spilled_count == 0
+    
+    dataset.add_memory_reporter(lambda: estimate_point_bytes(points) * 8)
+    dataset.add_data_points(points)
+    assert dataset.spilled_count == 8
+    assert len(dataset) == 8
+
+def test_datasets_sharing_spill_dir_do_not_collide(tmp_path):
+    """退避先を共有する複数のデータセットが互いのデータを上書きしないことのテスト"""
+    first = DataSet(memory_budget=0, spill_dir=str(tmp_path))
+    second = DataSet(memory_budget=0, spill_dir=str(tmp_path))
+    first_points = [DataPoint(datetime(2024, 1, 1), 1.0, "cat1"), DataPoint(datetime(2024, 1, 2), 2.0, "cat2")]
+    second_points = [DataPoint(datetime(2024, 1, 3), 3.0, "cat2"), DataPoint(datetime(2024, 1, 4), 4.0, "cat1")]
+    
+    for first_point, second_point in zip(first_points, second_points):
+        first.add_data_point(first_point)
+        second.add_data_point(second_point)
+    
+    assert first.get_data() == first_points
+    assert second.get_data() == second_points
+    assert len(list(tmp_path.iterdir())) == 2
+
+def test_dataset_spill_files_are_removed(tmp_path):
+    """close およびガベージコレクションで退避ファイルが削除されることのテスト"""
+    closed = DataSet(memory_budget=0, spill_dir=str(tmp_path))
+    closed.add_data_point(DataPoint(datetime(2024, 1, 1), 1.0, "cat1"))
+    collected = DataSet(memory_budget=0, spill_dir=str(tmp_path))
+    collected.add_data_point(DataPoint(datetime(2024, 1, 1), 1.0, "cat1"))
+    assert len(os.listdir(tmp_path)) == 2
+    
+    closed.close()
+    assert len(os.listdir(tmp_path)) == 1
+    with pytest.raises(RuntimeError):
+        len(closed)
+    with pytest.raises(RuntimeError):
+        closed.statistics()
+    with pytest.raises(RuntimeError):
+        closed.get_data()
+    with pytest.raises(RuntimeError):
+        closed.add_data_point(DataPoint(datetime(2024, 1, 2), 2.0, "cat1"))
+    closed.close()
+    
+    del collected
+    gc.collect()
+    assert os.listdir(tmp_path) == []
+
+def test_dataset_statistics_stay_resident(tmp_path):
+    """退避後も統計情報が保持されることのテスト"""
+    dataset = DataSet(memory_budget=0, spill_dir=str(tmp_path))
+    dataset.add_data_points([
+        DataPoint(datetime(2024, 1, 1), 10.0, "cat1"),
+        DataPoint(datetime(2024, 1, 2), 30.0, "cat2"),
+    ])
+    
+    stats = dataset.statistics()
+    assert dataset.spilled_count == 2
+    assert stats["count"] == 2
+    assert stats["sum"] == 40.0
+    assert stats["min"] == 10.0
+    assert stats["max"] == 30.0
+    assert stats["category_counts"] == {"cat1": 1, "cat2": 1}
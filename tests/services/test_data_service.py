@@ -54,3 +54,50 @@ def test_empty_dataset(data_service):
     results = data_service.get_analysis_results()
     assert "error" in results
     assert results["error"] == "データが存在しません"
+
+def test_time_series_analysis(data_service):
+    """時系列分析結果の取得テスト"""
+    df = pd.DataFrame({
+        'timestamp': ['2021-01-01', '2022-01-01', '2023-01-01'],
+        'value': [100.0, 110.0, 99.0],
+        'category': ['A', 'A', 'A']
+    })
+    data_service.process_data(df)
+    
+    results = data_service.get_time_series_analysis()
+    latest = results['latest'].loc['A']
+    assert latest['value'] == 99.0
+    assert latest['yoy_change'] == pytest.approx(-0.1)
+    assert latest['rolling_mean'] == pytest.approx(103.0)
+    assert results['growth_rates']['A'] == pytest.approx(0.99 ** 0.5 - 1)
+
+def test_time_series_analysis_empty(data_service):
+    """空のデータセットの時系列分析テスト"""
+    results = data_service.get_time_series_analysis()
+    assert results["error"] == "データが存在しません"
+
+def test_process_data_with_memory_budget(sample_dataframe, tmp_path):
+    """メモリ上限を超えたデータ処理のテスト"""
+    data_service = DataService(memory_budget=0, spill_dir=str(tmp_path))
+    data_service.process_data(sample_dataframe)
+    
+    results = data_service.get_analysis_results()
+    assert results['total_points'] == 3
+    assert results['statistics']['mean'] == 20.0
+    assert any(tmp_path.iterdir())
+    
+    latest = data_service.get_time_series_analysis()['latest']
+    assert latest.loc['A', 'value'] == 30.0
+
+def test_memory_budget_from_environment(monkeypatch, tmp_path):
+    """環境変数によるメモリ上限設定のテスト"""
+    monkeypatch.setenv("DATASET_MEMORY_BUDGET_MB", "0")
+    monkeypatch.setenv("DATASET_SPILL_DIR", str(tmp_path))
+    data_service = DataService()
+    data_service.process_data(pd.DataFrame({
+        'timestamp': ['2024-01-01'],
+        'value': [1.0],
+        'category': ['A']
+    }))
+    
+    assert any(tmp_path.iterdir())
@@ -0,0 +1,169 @@
+"""
+地理データサービスのテストモジュール
+"""
+import json
+import os
+import threading
+import numpy as np
+import pytest
+from src.services.geo_service import (
+    PrefectureGeometry,
+    ZOOM_TOLERANCES,
+    NO_DATA_COLOR,
+    build_choropleth_deck,
+    load_prefecture_geometry,
+)
+
+MULTI_LEVEL_TOLERANCES = {4: 0.02, 6: 0.005, 8: 0.001}
+
+def _circle(cx, cy, radius, points=200):
+    """閉じた円形リングを生成"""
+    angles = np.linspace(0, 2 * np.pi, points)
+    ring = np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+    ring[-1] = ring[0]
+    return ring.tolist()
+
+@pytest.fixture
+def geojson_path(tmp_path):
+    """テスト用の都道府県GeoJSONファイル"""
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"nam_ja": "東京都"},
+            "geometry": {"type": "Polygon", "coordinates": [_circle(139.7, 35.7, 0.3)]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"nam_ja": "沖縄県"},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [_circle(127.7, 26.2, 0.4)],
+                    [_circle(124.2, 24.4, 0.001, points=20)],
+                ],
+            },
+        },
+    ]
+    path = tmp_path / "prefectures.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return path
+
+def test_from_geojson_simplifies_by_level(geojson_path):
+    """ズームレベルが低いほど頂点数が少なくなることのテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path), tolerances=MULTI_LEVEL_TOLERANCES)
+
+    assert geometry.names == ["東京都", "沖縄県"]
+    counts = [geometry.point_count(level) for level in geometry.zoom_levels]
+    assert counts == sorted(counts)
+    assert counts[0] < 400
+
+    frame = geometry.polygon_frame(geometry.zoom_levels[0])
+    assert set(frame["name"]) == {"東京都", "沖縄県"}
+    assert all(ring[0] == ring[-1] for ring in frame["polygon"])
+
+def test_save_and_load_roundtrip(geojson_path, tmp_path):
+    """npz形式での保存と読み込みのテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path))
+    npz_path = tmp_path / "prefectures.npz"
+    geometry.save(str(npz_path))
+
+    loaded = PrefectureGeometry.load(str(npz_path))
+    assert loaded.names == geometry.names
+    assert loaded.zoom_levels == geometry.zoom_levels
+    for level in geometry.zoom_levels:
+        assert loaded.point_count(level) == geometry.point_count(level)
+
+def test_bind_values_reuses_polygons(geojson_path):
+    """値の結合でポリゴンが再構築されないことのテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path))
+    level = geometry.level_for_zoom(4.5)
+
+    first = geometry.bind_values({"東京都": 100.0, "沖縄県": 50.0}, level)
+    second = geometry.bind_values({"東京都": 10.0}, level)
+
+    assert first["polygon"].iloc[0] is second["polygon"].iloc[0]
+    tokyo = second[second["name"] == "東京都"].iloc[0]
+    okinawa = second[second["name"] == "沖縄県"].iloc[0]
+    assert tokyo["value"] == 10.0
+    assert okinawa["value"] is None
+    assert okinawa["fill_color"] == NO_DATA_COLOR
+
+def test_level_for_zoom(geojson_path):
+    """表示ズームに対する簡略化レベル選択のテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path), tolerances=MULTI_LEVEL_TOLERANCES)
+
+    assert geometry.level_for_zoom(2) == 4
+    assert geometry.level_for_zoom(5.5) == 4
+    assert geometry.level_for_zoom(7) == 6
+    assert geometry.level_for_zoom(12) == 8
+
+def test_load_prefecture_geometry_writes_cache(geojson_path):
+    """GeoJSON読み込み時にnpzキャッシュが作成されることのテスト"""
+    geometry = load_prefecture_geometry(str(geojson_path))
+
+    assert geometry is not None
+    assert geojson_path.with_suffix(".npz").exists()
+    assert load_prefecture_geometry(str(geojson_path)) is geometry
+
+def test_load_prefecture_geometry_missing_file(tmp_path):
+    """ジオメトリファイルが存在しない場合のテスト"""
+    assert load_prefecture_geometry(str(tmp_path / "missing.geojson")) is None
+
+def test_load_prefecture_geometry_picks_up_added_file(geojson_path, tmp_path):
+    """起動後に配置されたファイルが読み込まれることのテスト"""
+    path = tmp_path / "added.geojson"
+    assert load_prefecture_geometry(str(path)) is None
+
+    path.write_text(geojson_path.read_text(encoding="utf-8"), encoding="utf-8")
+    geometry = load_prefecture_geometry(str(path))
+    assert geometry is not None
+    assert geometry.zoom_levels == sorted(ZOOM_TOLERANCES)
+
+def test_build_choropleth_deck(geojson_path):
+    """コロプレス地図Deck生成のテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path))
+    deck = build_choropleth_deck(geometry, {"東京都": 1000.0})
+
+    payload = json.loads(deck.to_json())
+    assert payload["layers"][0]["@@type"] == "PolygonLayer"
+
+def test_load_prefecture_geometry_rebuilds_corrupted_cache(geojson_path):
+    """破損したnpzキャッシュがGeoJSONから再構築されることのテスト"""
+    cache = geojson_path.with_suffix(".npz")
+    cache.write_bytes(b"PK\x03\x04 truncated")
+    os.utime(cache, (geojson_path.stat().st_mtime + 10,) * 2)
+
+    geometry = load_prefecture_geometry(str(geojson_path))
+    assert geometry.names == ["東京都", "沖縄県"]
+    assert PrefectureGeometry.load(str(cache)).names == geometry.names
+
+def test_save_does_not_leave_temporary_files(geojson_path, tmp_path):
+    """保存が一時ファイルを残さず置き換えで行われることのテスト"""
+    geometry = PrefectureGeometry.from_geojson(str(geojson_path))
+    geometry.save(str(tmp_path / "out.npz"))
+    geometry.save(str(tmp_path / "out.npz"))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.npz", "prefectures.geojson"]
+
+def test_load_prefecture_geometry_builds_once_across_threads(geojson_path, monkeypatch):
+    """複数スレッドから同時に読み込んでも構築が一度だけ行われることのテスト"""
+    calls = []
+    original = PrefectureGeometry.from_geojson.__func__
+
+    def counting_from_geojson(cls, path, *args, **kwargs):
+        calls.append(path)
+        return original(cls, path, *args, **kwargs)
+
+    monkeypatch.setattr(PrefectureGeometry, "from_geojson", classmethod(counting_from_geojson))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(load_prefecture_geometry(str(geojson_path))))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,158 @@
+"""
+時系列ウィンドウ分析のテストモジュール
+"""
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+import pytest
+from src.models.data_model import DataPoint, DataSet
+from src.services.windowed_analytics import WindowedAnalytics
+
+@pytest.fixture
+def yearly_points():
+    """テスト用の年次データポイント"""
+    return [
+        DataPoint(datetime(year, 10, 1), value, category)
+        for category, values in {"A": [100, 110, 121, 133.1], "B": [50, 40, 30, 20]}.items()
+        for year, value in zip(range(2020, 2024), values)
+    ]
+
+def test_incremental_matches_pandas_rolling(yearly_points):
+    """増分更新の移動平均がpandasの再計算と一致することのテスト"""
+    dataset = DataSet()
+    analytics = WindowedAnalytics(dataset, window=2)
+    for dp in reversed(yearly_points):
+        dataset.add_data_point(dp)
+
+    df = pd.DataFrame({
+        "year": [dp.timestamp.year for dp in yearly_points],
+        "value": [dp.value for dp in yearly_points],
+        "category": [dp.category for dp in yearly_points],
+    })
+    expected = (
+        df.sort_values("year")
+        .groupby("category")["value"]
+        .rolling(2, min_periods=1).mean()
+    )
+    result = analytics.rolling_mean()
+
+    for category in ("A", "B"):
+        np.testing.assert_allclose(result[category].to_numpy(), expected[category].to_numpy())
+
+def test_existing_data_is_ingested(yearly_points):
+    """既存データが取り込まれ、一括追加も反映されることのテスト"""
+    dataset = DataSet()
+    dataset.add_data_points(yearly_points[:4])
+    analytics = WindowedAnalytics(dataset)
+
+    assert analytics.categories == ["A"]
+    dataset.add_data_points(yearly_points[4:])
+    assert analytics.categories == ["A", "B"]
+    assert analytics.values().shape == (4, 2)
+
+def test_yoy_and_growth_rates(yearly_points):
+    """前年同期比と年平均成長率のテスト"""
+    analytics = WindowedAnalytics()
+    analytics.ingest(yearly_points)
+
+    yoy = analytics.yoy_change()
+    assert np.isnan(yoy["A"].iloc[0])
+    np.testing.assert_allclose(yoy["A"].iloc[1:].to_numpy(), [0.1, 0.1, 0.1])
+    np.testing.assert_allclose(yoy["B"].iloc[1:].to_numpy(), [-0.2, -0.25, -1 / 3])
+
+    rates = analytics.growth_rates()
+    assert rates["A"] == pytest.approx(0.1)
+    assert rates["B"] == pytest.approx((20 / 50) ** (1 / 3) - 1)
+
+def test_same_period_keeps_latest_value():
+    """同一期間内では最新タイムスタンプの値が採用されることのテスト"""
+    analytics = WindowedAnalytics()
+    analytics.ingest([DataPoint(datetime(2020, 12, 1), 30.0, "A")])
+    analytics.ingest([DataPoint(datetime(2020, 1, 1), 10.0, "A")])
+    analytics.ingest([DataPoint(datetime(2019, 1, 1), 20.0, "A")])
+
+    values = analytics.values()["A"]
+    assert values.tolist() == [20.0, 30.0]
+    assert analytics.rolling_mean(window=2)["A"].tolist() == [20.0, 25.0]
+
+def test_monthly_yoy_uses_twelve_period_lag():
+    """月次データの前年同期比のテスト"""
+    analytics = WindowedAnalytics(freq="M", window=3)
+    analytics.ingest([
+        DataPoint(datetime(2023, 1, 1), 100.0, "A"),
+        DataPoint(datetime(2024, 1, 1), 90.0, "A"),
+    ])
+
+    latest = analytics.latest()
+    assert str(latest.loc["A", "period"]) == "2024-01"
+    assert latest.loc["A", "yoy_change"] == pytest.approx(-0.1)
+    assert latest.loc["A", "rolling_mean"] == 90.0
+
+def test_invalid_arguments():
+    """不正な引数のテスト"""
+    with pytest.raises(ValueError):
+        WindowedAnalytics(freq="D")
+    with pytest.raises(ValueError):
+        WindowedAnalytics(window=0)
+
+def test_rolling_mean_rejects_invalid_window(yearly_points):
+    """移動平均のウィンドウ引数の検証テスト"""
+    analytics = WindowedAnalytics(window=2)
+    analytics.ingest(yearly_points)
+
+    for window in (0, -1):
+        with pytest.raises(ValueError):
+            analytics.rolling_mean(window=window)
+    np.testing.assert_allclose(analytics.rolling_mean()["A"].to_numpy(), [100, 105, 115.5, 127.05])
+
+def test_non_finite_values_are_skipped():
+    """NaN・無限大の値が集計に影響しないことのテスト"""
+    dataset = DataSet()
+    analytics = WindowedAnalytics(dataset, window=2)
+    dataset.add_data_point(DataPoint(datetime(2020, 1, 1), float("nan"), "A"))
+    dataset.add_data_point(DataPoint(datetime(2020, 6, 1), 5.0, "A"))
+    dataset.add_data_point(DataPoint(datetime(2021, 1, 1), 7.0, "A"))
+    dataset.add_data_point(DataPoint(datetime(2021, 6, 1), float("inf"), "B"))
+
+    assert analytics.categories == ["A"]
+    assert analytics.values()["A"].tolist() == [5.0, 7.0]
+    assert analytics.rolling_mean()["A"].tolist() == [5.0, 6.0]
+
+def test_timezone_aware_timestamps_use_local_period():
+    """タイムゾーン付きタイムスタンプが現地時刻の期間に割り当てられることのテスト"""
+    jst = timezone(timedelta(hours=9))
+    analytics = WindowedAnalytics()
+    analytics.ingest([
+        DataPoint(datetime(2019, 1, 1, tzinfo=jst), 100.0, "A"),
+        DataPoint(datetime(2020, 1, 1, tzinfo=jst), 110.0, "A"),
+    ])
+
+    values = analytics.values()["A"]
+    assert [period.year for period in values.index] == [2019, 2020]
+    assert analytics.latest().loc["A", "yoy_change"] == pytest.approx(0.1)
+
+def test_window_counts_calendar_periods_with_gaps():
+    """欠測期間を含む系列ではウィンドウが暦上の期間数で数えられることのテスト"""
+    analytics = WindowedAnalytics(window=3)
+    analytics.ingest([
+        DataPoint(datetime(year, 10, 1), value, "A")
+        for year, value in [(2010, 100.0), (2015, 90.0), (2020, 80.0)]
+    ])
+
+    rolling = analytics.rolling_mean()["A"]
+    # 5年ごとの観測では直近3期間に観測が1件しか含まれない
+    np.testing.assert_array_equal(
+        rolling.to_numpy(),
+        [100.0, 100.0, 100.0, np.nan, np.nan, 90.0, 90.0, 90.0, np.nan, np.nan, 80.0]
+    )
+    assert analytics.yoy_change()["A"].isna().all()
+    assert analytics.growth_rates()["A"] == pytest.approx(0.8 ** 0.1 - 1)
+
+def test_matrix_memory_counts_against_dataset_budget(yearly_points):
+    """集計行列の使用量がデータセットのメモリ使用量に含まれることのテスト"""
+    dataset = DataSet()
+    analytics = WindowedAnalytics(dataset)
+    dataset.add_data_points(yearly_points)
+
+    assert analytics.nbytes > 0
+    assert dataset.resident_bytes >= analytics.nbytes